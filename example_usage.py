@@ -26,15 +26,19 @@ def main():
     try:
         print(f"Searching for: '{query}'...")
         
-        # Step 1: Search for paper IDs
-        pmids = searcher.search_papers(query, max_results=10)  # Smaller limit for example
+        # Step 1: Search with the company pre-filter applied at query level.
+        # search_papers already runs esearch + efetch and returns PubMedPaper objects
+        results = searcher.search_papers(query, max_results=10, filter_companies=True)  # Smaller limit for example
+        pmids = [paper.pubmed_id for paper in results]
         print(f"Found {len(pmids)} paper IDs")
         
         if not pmids:
             print("No papers found.")
             return
         
-        # Step 2: Fetch detailed information
+        # Step 2: Fetch the raw paper details for the same IDs. This deliberately
+        # downloads the papers from step 1 a second time, to show the lower-level
+        # fetch/filter API; real code would use one path or the other
         print("Fetching paper details...")
         papers_data = searcher.fetch_paper_details(pmids)
         print(f"Retrieved details for {len(papers_data)} papers")
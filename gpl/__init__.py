@@ -8,6 +8,7 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
+from .cache import ResponseCache
 from .core import PubMedSearcher, PubMedPaper, PubMedAPIError
 
-__all__ = ["PubMedSearcher", "PubMedPaper", "PubMedAPIError"]
\ No newline at end of file
+__all__ = ["PubMedSearcher", "PubMedPaper", "PubMedAPIError", "ResponseCache"]
\ No newline at end of file
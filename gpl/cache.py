@@ -0,0 +1,86 @@
+"""
+On-disk cache for PubMed E-utilities responses.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'gpl', 'pubmed.sqlite')
+DEFAULT_EXPIRE_AFTER = 24 * 60 * 60  # 24 hours
+
+
+class ResponseCache:
+    """SQLite-backed cache of response bodies keyed by endpoint and query parameters."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, expire_after: float = DEFAULT_EXPIRE_AFTER,
+                 refresh: bool = False) -> None:
+        """
+        Initialize response cache.
+
+        Args:
+            path: SQLite database file (':memory:' for a throwaway cache)
+            expire_after: Age in seconds after which a cached response is ignored
+            refresh: If True, never serve cached responses but still store new ones
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self.expire_after = expire_after
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, content BLOB NOT NULL, fetched_at REAL NOT NULL)'
+            )
+
+        # Drop stale entries up front so the database does not grow without bound
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(url: str, params: Dict[str, str]) -> str:
+        """Build a stable cache key from the endpoint URL and its parameters."""
+        query = '&'.join(f"{key}={value}" for key, value in sorted(params.items()))
+        return hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def get(self, url: str, params: Dict[str, str]) -> Optional[bytes]:
+        """Return the cached response body, or None if missing or expired."""
+        if self.refresh:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content, fetched_at FROM responses WHERE key = ?',
+                (self.make_key(url, params),)
+            ).fetchone()
+
+        if row is None or time.time() - row[1] > self.expire_after:
+            return None
+
+        return bytes(row[0])
+
+    def set(self, url: str, params: Dict[str, str], content: bytes) -> None:
+        """Store a response body for the given endpoint and parameters."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, content, fetched_at) VALUES (?, ?, ?)',
+                (self.make_key(url, params), content, time.time())
+            )
+
+    def purge_expired(self) -> None:
+        """Delete all responses older than expire_after."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM responses WHERE fetched_at < ?',
+                (time.time() - self.expire_after,)
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
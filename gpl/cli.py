@@ -5,14 +5,29 @@ CLI entry point for the GPL (Get Pharma Literature) tool.
 import csv
 import sys
 import logging
+import sqlite3
 from typing import List, Optional
 
 import click
-from tabulate import tabulate
 
+from .cache import ResponseCache
 from .core import PubMedSearcher, PubMedAPIError, PubMedPaper
 
 
+COLUMN_HEADERS = [
+    "PubMed ID",
+    "Title",
+    "Publication Date",
+    "Non-academic Author(s)",
+    "Company Affiliation(s)",
+    "Corresponding Author Email"
+]
+
+# Fixed column widths for terminal output, sized to the truncated cell contents
+TABLE_COLUMN_WIDTHS = (10, 53, 18, 33, 38, 33)
+TABLE_ROW_FORMAT = "  ".join(f"{{:<{width}.{width}}}" for width in TABLE_COLUMN_WIDTHS)
+
+
 def setup_logging(debug: bool = False) -> None:
     """Setup logging configuration."""
     level = logging.DEBUG if debug else logging.INFO
@@ -23,6 +38,9 @@ def setup_logging(debug: bool = False) -> None:
         format=format_string,
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    
+    # urllib3 logs each request line, including the API key, at DEBUG level
+    logging.getLogger('urllib3').setLevel(max(level, logging.INFO))
 
 
 def format_list_for_display(items: List[str], max_width: int = 40) -> str:
@@ -47,60 +65,46 @@ def display_papers_table(papers: List[PubMedPaper]) -> None:
         click.echo("No papers found with company affiliations")
         return
     
-    headers = [
-        "PubMed ID",
-        "Title", 
-        "Publication Date",
-        "Non-academic Author(s)",
-        "Company Affiliation(s)",
-        "Corresponding Author Email"
-    ]
+    click.echo(f"\nFound {len(papers)} papers with pharmaceutical/biotech company affiliations:\n")
+    click.echo(TABLE_ROW_FORMAT.format(*COLUMN_HEADERS).rstrip())
+    click.echo("  ".join("-" * width for width in TABLE_COLUMN_WIDTHS))
     
-    table_data = []
+    # Rows are streamed as they are formatted instead of being measured up front
     for paper in papers:
         # Truncate long titles for table display
         title = paper.title[:50] + "..." if len(paper.title) > 50 else paper.title
+        email = (paper.corresponding_email[:30] + "..." if len(paper.corresponding_email) > 30
+                 else paper.corresponding_email)
         
-        row = [
+        click.echo(TABLE_ROW_FORMAT.format(
             paper.pubmed_id,
             title,
             paper.publication_date,
             format_list_for_display(paper.non_academic_authors, 30),
             format_list_for_display(paper.company_affiliations, 35),
-            paper.corresponding_email[:30] + "..." if len(paper.corresponding_email) > 30 
-            else paper.corresponding_email
-        ]
-        table_data.append(row)
-    
-    click.echo(f"\nFound {len(papers)} papers with pharmaceutical/biotech company affiliations:\n")
-    click.echo(tabulate(table_data, headers=headers, tablefmt="grid", stralign="left"))
+            email
+        ).rstrip())
 
 
 def save_papers_csv(papers: List[PubMedPaper], filename: str) -> None:
     """Save papers to CSV file."""
     try:
+        rows = [
+            (
+                paper.pubmed_id,
+                paper.title,
+                paper.publication_date,
+                "; ".join(paper.non_academic_authors),
+                "; ".join(paper.company_affiliations),
+                paper.corresponding_email
+            )
+            for paper in papers
+        ]
+        
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                "PubMed ID",
-                "Title", 
-                "Publication Date",
-                "Non-academic Author(s)",
-                "Company Affiliation(s)",
-                "Corresponding Author Email"
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for paper in papers:
-                writer.writerow({
-                    "PubMed ID": paper.pubmed_id,
-                    "Title": paper.title,
-                    "Publication Date": paper.publication_date,
-                    "Non-academic Author(s)": "; ".join(paper.non_academic_authors),
-                    "Company Affiliation(s)": "; ".join(paper.company_affiliations),
-                    "Corresponding Author Email": paper.corresponding_email
-                })
+            writer = csv.writer(csvfile)
+            writer.writerow(COLUMN_HEADERS)
+            writer.writerows(rows)
         
         click.echo(f"Results saved to {filename}")
         
@@ -114,9 +118,13 @@ def save_papers_csv(papers: List[PubMedPaper], filename: str) -> None:
 @click.option('--file', '-f', 'output_file', help='Save results to CSV file')
 @click.option('--debug', '-d', is_flag=True, help='Enable debug logging')
 @click.option('--no-prefilter', is_flag=True, help='Disable pre-filtering at search level (slower but more comprehensive)')
+@click.option('--no-cache', is_flag=True, help='Do not read or write the on-disk response cache')
+@click.option('--refresh', is_flag=True, help='Ignore cached responses and re-fetch from PubMed')
+@click.option('--api-key', envvar='NCBI_API_KEY', help='NCBI API key, raises the rate limit to 10 requests/sec (env: NCBI_API_KEY)')
 
 
-def main(query: Optional[str], output_file: Optional[str], debug: bool, no_prefilter: bool) -> None:
+def main(query: Optional[str], output_file: Optional[str], debug: bool, no_prefilter: bool,
+         no_cache: bool, refresh: bool, api_key: Optional[str]) -> None:
     """
     GPL - Get Pharma Literature
     
@@ -130,6 +138,8 @@ def main(query: Optional[str], output_file: Optional[str], debug: bool, no_prefi
         gpl "diabetes treatment" --file results.csv
         gpl "immunotherapy" --debug
         gpl "cancer therapy" --no-prefilter  # Disable search-level filtering
+        gpl "cancer therapy" --refresh  # Bypass cached responses
+        gpl "cancer therapy" --api-key YOUR_KEY  # Or set NCBI_API_KEY
         gpl --help
     """
     if not query:
@@ -143,7 +153,14 @@ def main(query: Optional[str], output_file: Optional[str], debug: bool, no_prefi
     
     try:
         # Initialize searcher
-        searcher = PubMedSearcher()
+        cache = None
+        if not no_cache:
+            try:
+                cache = ResponseCache(refresh=refresh)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Response cache unavailable, continuing without it: {str(e)}")
+        
+        searcher = PubMedSearcher(cache=cache, api_key=api_key)
         
         # Search for papers
         use_prefilter = not no_prefilter
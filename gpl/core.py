@@ -5,20 +5,83 @@ Core module for PubMed querying and filtering pharmaceutical/biotech papers.
 import re
 import time
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 
 import requests
 from requests.exceptions import RequestException, Timeout
 
+from .cache import ResponseCache
+
 
 logger = logging.getLogger(__name__)
 
+# Precompiled pattern for pulling contact emails out of article text. The
+# lookbehind only lets a match start at the beginning of a run of local-part
+# characters, and domain labels cannot contain dots, so neither side backtracks
+# character by character over long runs (e.g. sequences in abstracts)
+_EMAIL_RE = re.compile(
+    r'(?<![a-zA-Z0-9._%+-])([a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,})'
+)
+
+# Month abbreviations indexed by month number (index 0 unused)
+_MONTH_ABBR = (
+    '', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'
+)
+
+# Major pharmaceutical and biotech company names for targeted searching
+MAJOR_COMPANIES = (
+    "pfizer", "moderna", "johnson johnson", "merck", "novartis", "roche",
+    "bristol myers", "abbvie", "gilead", "amgen", "biogen", "regeneron",
+    "eli lilly", "gsk", "glaxosmithkline", "astrazeneca", "sanofi",
+    "takeda", "bayer", "boehringer ingelheim", "vertex", "celgene"
+)
+
+# Generic company indicators
+COMPANY_TERMS = (
+    "pharmaceutical", "pharmaceuticals", "pharma", "biotech", "biotechnology",
+    "therapeutics", "biopharmaceutical", "inc", "ltd", "corp",
+    "corporation", "company", "laboratories", "lab"
+)
+
+# Indicators of an academic or clinical (non-company) affiliation
+ACADEMIC_TERMS = (
+    "university", "universidad", "universidade", "universita", "università",
+    "universität", "université", "universiteit", "college", "school",
+    "hospital", "institute", "academy", "faculty", "medical center",
+    "medical centre", "clinic"
+)
+
+
+def _compile_terms(terms: Tuple[str, ...]) -> Pattern[str]:
+    """Compile terms into one case-insensitive, whole-word alternation."""
+    alternatives = (r'\W+'.join(map(re.escape, term.split())) for term in terms)
+    return re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+
+
+# Each affiliation is classified with a single scan per pattern
+_COMPANY_RE = _compile_terms(MAJOR_COMPANIES + COMPANY_TERMS)
+_ACADEMIC_RE = _compile_terms(ACADEMIC_TERMS)
+
 
 @dataclass
 class PubMedPaper:
     """Data class representing a PubMed paper with company affiliations."""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10+) drops the
+    # per-instance __dict__ for large result sets
+    __slots__ = (
+        'pubmed_id', 'title', 'publication_date', 'non_academic_authors',
+        'company_affiliations', 'corresponding_email'
+    )
+    
     pubmed_id: str
     title: str
     publication_date: str
@@ -27,6 +90,48 @@ class PubMedPaper:
     corresponding_email: str
 
 
+def _element_text(elem: Optional[ET.Element]) -> str:
+    """Return the stripped text of an element including nested markup."""
+    if elem is None:
+        return ''
+    return ''.join(elem.itertext()).strip()
+
+
+def _retry_after_seconds(value: Optional[str], default: float = 1.0, maximum: float = 60.0) -> float:
+    """Convert a Retry-After header to seconds, capped at maximum, falling back to a default delay."""
+    try:
+        return min(max(float(value), 0.0), maximum)
+    except (TypeError, ValueError):
+        return default
+
+
+def _cached_response(url: str, content: bytes) -> requests.Response:
+    """Wrap a cached response body in a requests.Response."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response.from_cache = True
+    return response
+
+
+@lru_cache(maxsize=4096)
+def _is_company_affiliation(affiliation: str) -> bool:
+    """
+    Check whether an affiliation names a company and no academic institution.
+    
+    Co-authors and repeat papers share affiliation strings, so results are
+    memoised and each distinct affiliation is only scanned once.
+    """
+    if not affiliation:
+        return False
+    
+    return (
+        _COMPANY_RE.search(affiliation) is not None
+        and _ACADEMIC_RE.search(affiliation) is None
+    )
+
+
 class PubMedAPIError(Exception):
     """Custom exception for PubMed API related errors."""
     pass
@@ -38,15 +143,36 @@ class PubMedSearcher:
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
     SEARCH_URL = f"{BASE_URL}/esearch.fcgi"
     FETCH_URL = f"{BASE_URL}/efetch.fcgi"
+    FETCH_BATCH_SIZE = 100
+    MAX_RETRIES = 3
     
-    def __init__(self, rate_limit: float = 0.34) -> None:
+    def __init__(self, rate_limit: Optional[float] = None, max_concurrency: int = 3,
+                 cache: Optional[ResponseCache] = None, api_key: Optional[str] = None) -> None:
         """
         Initialize PubMed searcher.
         
         Args:
-            rate_limit: Delay between requests in seconds (default: 0.34s for 3 req/sec)
+            rate_limit: Minimum delay between requests in seconds (default: 0.34s for
+                3 req/sec, or 0.1s for 10 req/sec when an API key is given)
+            max_concurrency: Maximum number of efetch batches in flight at once
+            cache: Optional on-disk cache for API responses
+            api_key: Optional NCBI API key, sent with every request
         """
+        if rate_limit is None:
+            rate_limit = 0.1 if api_key else 0.34
+        
         self.rate_limit = rate_limit
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.api_key = api_key
+        self._rate_lock = threading.Lock()
+        self._next_allowed = 0.0
+        
+        # The company filter depends only on constant keyword lists, so build it
+        # once using PubMed's [ad] field tag (author affiliation)
+        company_affiliation_parts = [f'"{company}"[ad]' for company in MAJOR_COMPANIES]
+        company_affiliation_parts += [f'{term}[ad]' for term in COMPANY_TERMS]
+        self._company_filter_suffix = " AND (" + " OR ".join(company_affiliation_parts) + ")"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'GPL-PubMed-Tool/1.0 (https://github.com/yourusername/gpl)'
@@ -93,6 +219,11 @@ class PubMedSearcher:
             
             if 'esearchresult' not in data:
                 raise PubMedAPIError("Invalid response format from PubMed search")
+            if 'ERROR' in data['esearchresult']:
+                raise PubMedAPIError(f"PubMed search failed: {data['esearchresult']['ERROR']}")
+            
+            # Only cache search results once they are known to be valid
+            self._cache_response(self.SEARCH_URL, params, response)
             
             pmids = data['esearchresult'].get('idlist', [])
             logger.info(f"Found {len(pmids)} papers for query: '{query}' (enhanced: {filter_companies})")
@@ -104,32 +235,63 @@ class PubMedSearcher:
             paper_details = self.fetch_paper_details(pmids)
             
             # Parse details into PubMedPaper objects
-            papers = []
-            for paper_data in paper_details:
-                pub_date = self._format_publication_date(paper_data.get('pub_date', ''))
-                email = self._extract_corresponding_email(paper_data)
-                
-                # Extract author names and affiliations
-                author_names = [author.get('name', '') for author in paper_data.get('authors', []) if author.get('name')]
-                affiliations = list(set([author.get('affiliation', '') for author in paper_data.get('authors', []) if author.get('affiliation')]))
-                
-                paper = PubMedPaper(
-                    pubmed_id=paper_data.get('pmid', ''),
-                    title=paper_data.get('title', ''),
-                    publication_date=pub_date,
-                    non_academic_authors=author_names,
-                    company_affiliations=affiliations,
-                    corresponding_email=email
-                )
-                papers.append(paper)
-            
-            return papers
+            return [
+                self._build_paper(paper_data, paper_data.get('authors', ()))
+                for paper_data in paper_details
+            ]
             
         except RequestException as e:
             raise PubMedAPIError(f"Failed to search PubMed: {str(e)}")
         except Exception as e:
             raise PubMedAPIError(f"Unexpected error during PubMed search: {str(e)}")
     
+    def filter_company_papers(self, papers_data: List[Dict[str, Any]]) -> List[PubMedPaper]:
+        """
+        Keep only papers with at least one author at a pharmaceutical/biotech company.
+        
+        Args:
+            papers_data: Paper detail dictionaries from fetch_paper_details
+            
+        Returns:
+            List of PubMedPaper objects listing only the company-affiliated authors
+        """
+        is_company = _is_company_affiliation
+        papers = []
+        for paper_data in papers_data:
+            company_authors = [
+                author for author in paper_data.get('authors', ())
+                if is_company(author.get('affiliation', ''))
+            ]
+            if company_authors:
+                papers.append(self._build_paper(paper_data, company_authors))
+        
+        return papers
+    
+    def _build_paper(self, paper_data: Dict[str, Any], authors: Iterable[Dict[str, str]]) -> PubMedPaper:
+        """Build a PubMedPaper from paper details, listing the given authors."""
+        # Extract author names and unique affiliations in author order
+        author_names = []
+        affiliations = []
+        seen_affiliations = set()
+        for author in authors:
+            if author.get('name'):
+                author_names.append(author['name'])
+            
+            affiliation = author.get('affiliation', '').strip()
+            key = affiliation.lower()
+            if affiliation and key not in seen_affiliations:
+                seen_affiliations.add(key)
+                affiliations.append(affiliation)
+        
+        return PubMedPaper(
+            pubmed_id=paper_data.get('pmid', ''),
+            title=paper_data.get('title', ''),
+            publication_date=self._format_publication_date(paper_data.get('pub_date', '')),
+            non_academic_authors=author_names,
+            company_affiliations=affiliations,
+            corresponding_email=self._extract_corresponding_email(paper_data)
+        )
+    
     def _build_company_filtered_query(self, query: str) -> str:
         """
         Build a PubMed query that filters for company affiliations using search field tags.
@@ -140,47 +302,17 @@ class PubMedSearcher:
         Returns:
             Enhanced query with company affiliation filters
         """
-        # Major pharmaceutical and biotech company names for targeted searching
-        major_companies = [
-            "pfizer", "moderna", "johnson johnson", "merck", "novartis", "roche", 
-            "bristol myers", "abbvie", "gilead", "amgen", "biogen", "regeneron",
-            "eli lilly", "gsk", "glaxosmithkline", "astrazeneca", "sanofi",
-            "takeda", "bayer", "boehringer ingelheim", "vertex", "celgene"
-        ]
-        
-        # Generic company indicators
-        company_terms = [
-            "pharmaceutical", "pharmaceuticals", "pharma", "biotech", "biotechnology",
-            "therapeutics", "biopharmaceutical", "inc", "ltd", "corp",
-            "corporation", "company", "laboratories", "lab"
-        ]
-        
-        # Build affiliation search terms using PubMed's [ad] field tag (author affiliation)
-        company_affiliation_parts = []
-        
-        # Add major company names
-        for company in major_companies:
-            company_affiliation_parts.append(f'"{company}"[ad]')
-        
-        # Add generic company terms
-        for term in company_terms:
-            company_affiliation_parts.append(f'{term}[ad]')
-        
-        # Combine with OR operators
-        company_filter = "(" + " OR ".join(company_affiliation_parts) + ")"
-        
         # No longer excluding academic affiliations - allow mixed company/academic papers
         # Focus only on including papers with company affiliations
-        
-        # Combine original query with company filter only
-        enhanced_query = f"({query}) AND {company_filter}"
-        
-        return enhanced_query
+        return f"({query}){self._company_filter_suffix}"
     
     def fetch_paper_details(self, pmids: List[str]) -> List[Dict[str, Any]]:
         """
         Fetch detailed information for given PubMed IDs.
         
+        IDs are requested in batches of FETCH_BATCH_SIZE, with up to
+        max_concurrency batches in flight at once.
+        
         Args:
             pmids: List of PubMed IDs
             
@@ -193,6 +325,31 @@ class PubMedSearcher:
         if not pmids:
             return []
         
+        batches = [pmids[i:i + self.FETCH_BATCH_SIZE] for i in range(0, len(pmids), self.FETCH_BATCH_SIZE)]
+        logger.debug(f"Fetching {len(pmids)} papers in {len(batches)} batch(es)")
+        
+        try:
+            if len(batches) == 1:
+                return self._fetch_batch(batches[0])
+            
+            # Batches are downloaded and parsed concurrently, so one batch is
+            # parsed while the next is still in flight; _make_request still
+            # spaces out the request starts so the NCBI rate limit is respected
+            papers = []
+            workers = min(self.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for batch_papers in executor.map(self._fetch_batch, batches):
+                    papers.extend(batch_papers)
+            
+            return papers
+            
+        except RequestException as e:
+            raise PubMedAPIError(f"Failed to fetch paper details: {str(e)}")
+        except ET.ParseError as e:
+            raise PubMedAPIError(f"Failed to parse paper details: {str(e)}")
+    
+    def _fetch_batch(self, pmids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch and parse the details for a single batch of PubMed IDs."""
         params = {
             'db': 'pubmed',
             'id': ','.join(pmids),
@@ -204,102 +361,161 @@ class PubMedSearcher:
         logger.debug(f"Fetching paper details with URL: {self.FETCH_URL}")
         logger.debug(f"Fetch parameters: {params}")
         
-        try:
-            response = self._make_request(self.FETCH_URL, params)
-            xml_content = response.text
-            
-            logger.debug(f"Fetch response length: {len(xml_content)} characters")
-            logger.debug(f"Fetch response preview: {xml_content[:500]}...")
+        response = self._make_request(self.FETCH_URL, params)
+        xml_content = response.content
+        
+        logger.debug(f"Fetch response length: {len(xml_content)} bytes")
+        logger.debug(f"Fetch response preview: {xml_content[:500]!r}...")
+        
+        papers = self._parse_xml_response(xml_content)
+        
+        # Only cache the batch once it has parsed successfully
+        self._cache_response(self.FETCH_URL, params, response)
+        
+        return papers
+    
+    def _make_request(self, url: str, params: Dict[str, str]) -> requests.Response:
+        """
+        Make rate-limited request to PubMed API, retrying when throttled (HTTP 429).
+        
+        Responses are served from the cache when available, but fresh responses
+        are not stored here; callers store them with _cache_response once the
+        payload has been validated.
+        """
+        # Cached responses skip both the network and the rate-limit delay
+        if self.cache is not None:
+            try:
+                content = self.cache.get(url, params)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache read failed, fetching from PubMed: {str(e)}")
+                content = None
             
-            return self._parse_xml_response(xml_content)
+            if content is not None:
+                logger.debug(f"Serving cached response for {url}")
+                return _cached_response(url, content)
+        
+        # The API key is left out of the cache key so cached entries are shared
+        request_params = {**params, 'api_key': self.api_key} if self.api_key else params
+        
+        try:
+            for attempt in range(self.MAX_RETRIES + 1):
+                self._wait_for_rate_limit()
+                
+                response = self.session.get(url, params=request_params, timeout=30)
+                if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                    break
+                
+                delay = _retry_after_seconds(response.headers.get('Retry-After'))
+                logger.warning(f"Rate limited by PubMed, retrying in {delay:.1f}s")
+                time.sleep(delay)
             
+            response.raise_for_status()
         except RequestException as e:
-            raise PubMedAPIError(f"Failed to fetch paper details: {str(e)}")
-    
-    def _make_request(self, url: str, params: Dict[str, str]) -> requests.Response:
-        """Make rate-limited request to PubMed API."""
-        time.sleep(self.rate_limit)  # Rate limiting
+            # requests puts the full URL, query string included, in its error
+            # messages; re-raise without the API key or the original exception
+            raise type(e)(self._redact(str(e))) from None
         
-        response = self.session.get(url, params=params, timeout=30)
-        response.raise_for_status()
+        response.from_cache = False
         return response
     
-    def _parse_xml_response(self, xml_content: str) -> List[Dict[str, Any]]:
+    def _redact(self, text: str) -> str:
+        """Remove the API key from text that may end up in errors or logs."""
+        return text.replace(self.api_key, '***') if self.api_key else text
+    
+    def _cache_response(self, url: str, params: Dict[str, str], response: requests.Response) -> None:
+        """Store a validated response in the cache unless it was served from it."""
+        if self.cache is None or response.from_cache:
+            return
+        
+        try:
+            self.cache.set(url, params, response.content)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed, continuing without caching: {str(e)}")
+    
+    def _wait_for_rate_limit(self) -> None:
+        """Sleep only as long as needed to keep requests rate_limit seconds apart."""
+        # Hold the lock while sleeping so concurrent callers are spaced out
+        with self._rate_lock:
+            wait = self._next_allowed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_allowed = time.monotonic() + self.rate_limit
+    
+    def _parse_xml_response(self, xml_content: bytes) -> List[Dict[str, Any]]:
         """
         Parse XML response from PubMed efetch API.
         
-        This is a simplified XML parser for demonstration.
-        In production, consider using xml.etree.ElementTree or lxml.
+        Articles are streamed with ElementTree.iterparse and detached from the
+        document root once processed, so only the article being parsed is
+        held in memory rather than the whole batch.
         """
         papers = []
         
-        # Improved regex patterns for PubMed XML structure
-        pmid_pattern = r'<PMID[^>]*>(\d+)</PMID>'
-        title_pattern = r'<ArticleTitle>([^<]+)</ArticleTitle>'
-        
-        # Updated author pattern to handle nested affiliation structure
-        # Pattern that works: extract from within each individual author section
-        author_pattern = r'<LastName>([^<]+)</LastName>.*?<ForeName>([^<]*)</ForeName>.*?<AffiliationInfo>.*?<Affiliation>([^<]*)</Affiliation>'
+        # Bind hot lookups to locals once instead of resolving them per author
+        append_paper = papers.append
+        element_text = _element_text
+        email_findall = _EMAIL_RE.findall
         
-        date_pattern = r'<PubDate>.*?<Year>(\d{4})</Year>(?:.*?<Month>([^<]*)</Month>)?(?:.*?<Day>(\d+)</Day>)?.*?</PubDate>'
-        email_pattern = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+        events = ET.iterparse(BytesIO(xml_content), events=('start', 'end'))
+        _, root = next(events)
         
-        pmids = re.findall(pmid_pattern, xml_content)
-        titles = re.findall(title_pattern, xml_content, re.DOTALL)
-        
-        # Split by PubmedArticle for individual paper processing
-        articles = re.split(r'<PubmedArticle[^>]*>', xml_content)
-        
-        for i, article in enumerate(articles[1:], 0):  # Skip first empty split
-            if i >= len(pmids):
-                break
-                
+        for event, article in events:
+            if event != 'end' or article.tag != 'PubmedArticle':
+                continue
+            
+            # Resolve the Article element once and address every field by its
+            # direct path rather than searching the whole subtree per field
+            details = article.find('MedlineCitation/Article')
+            if details is None:
+                details = ET.Element('Article')
+            
+            authors = []
+            emails = []
             paper = {
-                'pmid': pmids[i] if i < len(pmids) else '',
-                'title': titles[i] if i < len(titles) else '',
-                'authors': [],
+                'pmid': article.findtext('MedlineCitation/PMID', ''),
+                'title': element_text(details.find('ArticleTitle')),
+                'authors': authors,
                 'pub_date': '',
-                'emails': []
+                'emails': emails
             }
             
-            # Extract authors and affiliations with improved approach
-            # First, find all individual Author sections
-            individual_authors = re.findall(r'<Author[^>]*>(.*?)</Author>', article, re.DOTALL)
-            
-            for author_section in individual_authors:
-                # Extract name components
-                last_name_match = re.search(r'<LastName>([^<]+)</LastName>', author_section)
-                first_name_match = re.search(r'<ForeName>([^<]*)</ForeName>', author_section)
+            for author in details.iterfind('AuthorList/Author'):
+                last_name = author.findtext('LastName')
+                first_name = author.findtext('ForeName')
                 
-                if last_name_match and first_name_match:
-                    last_name = last_name_match.group(1)
-                    first_name = first_name_match.group(1)
+                if last_name and first_name is not None:
+                    # Affiliation may or may not exist
+                    affiliation = element_text(author.find('AffiliationInfo/Affiliation'))
                     
-                    # Extract affiliation (may or may not exist)
-                    affiliation_match = re.search(r'<AffiliationInfo>.*?<Affiliation>([^<]*)</Affiliation>', author_section, re.DOTALL)
-                    affiliation = affiliation_match.group(1).strip() if affiliation_match else ''
-                    
-                    author_info = {
+                    authors.append({
                         'name': f"{first_name} {last_name}".strip(),
                         'affiliation': affiliation
-                    }
-                    paper['authors'].append(author_info)
+                    })
+                    
+                    # Corresponding-author emails usually sit in the affiliation;
+                    # a plain substring check skips the regex when there are none
+                    if '@' in affiliation:
+                        emails.extend(email_findall(affiliation))
             
             # Extract publication date
-            date_match = re.search(date_pattern, article, re.DOTALL)
-            if date_match:
-                year, month, day = date_match.groups()
+            pub_date = details.find('Journal/JournalIssue/PubDate')
+            if pub_date is not None and pub_date.findtext('Year'):
                 paper['pub_date'] = {
-                    'year': year,
-                    'month': month or '',
-                    'day': day or ''
+                    'year': pub_date.findtext('Year'),
+                    'month': pub_date.findtext('Month', ''),
+                    'day': pub_date.findtext('Day', '')
                 }
             
-            # Extract emails
-            emails = re.findall(email_pattern, article)
-            paper['emails'] = emails
+            # Fall back to scanning the whole article text for emails
+            if not emails:
+                article_text = ' '.join(article.itertext())
+                if '@' in article_text:
+                    paper['emails'] = email_findall(article_text)
+            
+            append_paper(paper)
             
-            papers.append(paper)
+            # Drop finished articles from the root so they can be freed
+            root.clear()
         
         return papers
     
@@ -316,13 +532,10 @@ class PubMedSearcher:
             return "Date not available"
         
         # Convert month number to name if numeric
-        month_names = {
-            '1': 'Jan', '2': 'Feb', '3': 'Mar', '4': 'Apr', '5': 'May', '6': 'Jun',
-            '7': 'Jul', '8': 'Aug', '9': 'Sep', '10': 'Oct', '11': 'Nov', '12': 'Dec'
-        }
-        
         if month.isdigit():
-            month = month_names.get(month, month)
+            month_number = int(month)
+            if 1 <= month_number <= 12:
+                month = _MONTH_ABBR[month_number]
         elif month:
             month = month[:3].capitalize()  # Take first 3 chars and capitalize
         
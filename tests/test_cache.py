@@ -0,0 +1,65 @@
+"""
+Tests for the GPL response cache.
+"""
+
+from unittest.mock import patch
+from gpl.cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+    
+    URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        self.cache = ResponseCache(':memory:')
+    
+    def teardown_method(self):
+        """Close the cache database."""
+        self.cache.close()
+    
+    def test_get_missing(self):
+        """Test lookup of a response that was never stored."""
+        assert self.cache.get(self.URL, {'id': '1'}) is None
+    
+    def test_set_and_get(self):
+        """Test round trip of a stored response."""
+        self.cache.set(self.URL, {'id': '1', 'db': 'pubmed'}, b'<xml/>')
+        assert self.cache.get(self.URL, {'db': 'pubmed', 'id': '1'}) == b'<xml/>'
+        assert self.cache.get(self.URL, {'db': 'pubmed', 'id': '2'}) is None
+    
+    def test_expired_entry_ignored(self):
+        """Test that entries older than expire_after are not served."""
+        self.cache.set(self.URL, {'id': '1'}, b'<xml/>')
+        
+        with patch('time.time', return_value=self.cache.expire_after * 2 + 1e10):
+            assert self.cache.get(self.URL, {'id': '1'}) is None
+    
+    def test_purge_expired(self):
+        """Test that expired rows are deleted from the database."""
+        self.cache.set(self.URL, {'id': '1'}, b'<xml/>')
+        
+        with patch('time.time', return_value=self.cache.expire_after * 2 + 1e10):
+            self.cache.set(self.URL, {'id': '2'}, b'<xml/>')
+            self.cache.purge_expired()
+        
+        count = self.cache._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        assert count == 1
+    
+    def test_refresh_skips_reads(self):
+        """Test that a refreshing cache stores but never serves responses."""
+        self.cache.set(self.URL, {'id': '1'}, b'<xml/>')
+        self.cache.refresh = True
+        assert self.cache.get(self.URL, {'id': '1'}) is None
+    
+    def test_file_backed_cache(self, tmp_path):
+        """Test that responses persist across cache instances."""
+        path = str(tmp_path / 'nested' / 'pubmed.sqlite')
+        cache = ResponseCache(path)
+        cache.set(self.URL, {'id': '1'}, b'<xml/>')
+        cache.close()
+        
+        reopened = ResponseCache(path)
+        assert reopened.get(self.URL, {'id': '1'}) == b'<xml/>'
+        reopened.close()
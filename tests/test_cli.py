@@ -0,0 +1,162 @@
+"""
+Tests for the GPL command-line interface.
+"""
+
+import csv
+import logging
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from gpl.cli import COLUMN_HEADERS, TABLE_COLUMN_WIDTHS, display_papers_table, main, save_papers_csv
+from gpl.core import PubMedPaper
+
+
+def make_paper(**overrides):
+    """Build a PubMedPaper with sensible defaults."""
+    fields = {
+        'pubmed_id': '12345',
+        'title': 'Test Paper',
+        'publication_date': 'Jan 15 2023',
+        'non_academic_authors': ['John Doe'],
+        'company_affiliations': ['Pfizer Inc.'],
+        'corresponding_email': 'test@pfizer.com'
+    }
+    fields.update(overrides)
+    return PubMedPaper(**fields)
+
+
+def column_starts(widths):
+    """Return the character offset where each table column begins."""
+    starts, offset = [], 0
+    for width in widths:
+        starts.append(offset)
+        offset += width + 2
+    return starts
+
+
+class TestDisplayPapersTable:
+    """Test cases for display_papers_table."""
+    
+    def test_no_papers(self, capsys):
+        """Test the message shown for an empty result set."""
+        display_papers_table([])
+        assert capsys.readouterr().out == "No papers found with company affiliations\n"
+    
+    def test_header_and_separator(self, capsys):
+        """Test that the header and separator line up with the column widths."""
+        display_papers_table([make_paper()])
+        lines = capsys.readouterr().out.splitlines()
+        
+        assert lines[1] == "Found 1 papers with pharmaceutical/biotech company affiliations:"
+        header, separator = lines[3], lines[4]
+        for start, title in zip(column_starts(TABLE_COLUMN_WIDTHS), COLUMN_HEADERS):
+            assert header[start:start + len(title)] == title
+        assert separator == "  ".join("-" * width for width in TABLE_COLUMN_WIDTHS)
+    
+    def test_row_alignment_and_truncation(self, capsys):
+        """Test that long cells are truncated and every column starts in place."""
+        paper = make_paper(
+            title='T' * 80,
+            non_academic_authors=['John Doe', 'Jane Roe', 'Ann Lee'],
+            company_affiliations=['A' * 60],
+            corresponding_email='a.very.long.corresponding.address@pfizer.com'
+        )
+        display_papers_table([paper])
+        row = capsys.readouterr().out.splitlines()[5]
+        
+        cells = [
+            row[start:start + width].rstrip()
+            for start, width in zip(column_starts(TABLE_COLUMN_WIDTHS), TABLE_COLUMN_WIDTHS)
+        ]
+        assert cells == [
+            '12345',
+            'T' * 50 + '...',
+            'Jan 15 2023',
+            'John Doe... (+2 more)',
+            'A' * 35 + '...',
+            'a.very.long.corresponding.addr...'
+        ]
+        assert len(row) <= sum(TABLE_COLUMN_WIDTHS) + 2 * (len(TABLE_COLUMN_WIDTHS) - 1)
+    
+    def test_cells_capped_at_column_width(self, capsys):
+        """Test that an overlong cell cannot push later columns out of place."""
+        display_papers_table([make_paper(pubmed_id='1' * 20)])
+        row = capsys.readouterr().out.splitlines()[5]
+        
+        assert row[:TABLE_COLUMN_WIDTHS[0]] == '1' * TABLE_COLUMN_WIDTHS[0]
+        assert row[column_starts(TABLE_COLUMN_WIDTHS)[1]:].startswith('Test Paper')
+
+
+class TestSavePapersCsv:
+    """Test cases for save_papers_csv."""
+    
+    def test_round_trip(self, tmp_path):
+        """Test that saved rows read back with the expected columns."""
+        filename = str(tmp_path / 'results.csv')
+        papers = [
+            make_paper(),
+            make_paper(
+                pubmed_id='67890',
+                title='Commas, "quotes" and more',
+                non_academic_authors=['Jane Roe', 'Ann Lee'],
+                company_affiliations=['Moderna Inc.', 'Amgen Inc.']
+            )
+        ]
+        
+        save_papers_csv(papers, filename)
+        
+        with open(filename, newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.reader(csvfile))
+        
+        assert rows[0] == COLUMN_HEADERS
+        assert rows[1] == ['12345', 'Test Paper', 'Jan 15 2023', 'John Doe', 'Pfizer Inc.', 'test@pfizer.com']
+        assert rows[2] == [
+            '67890', 'Commas, "quotes" and more', 'Jan 15 2023',
+            'Jane Roe; Ann Lee', 'Moderna Inc.; Amgen Inc.', 'test@pfizer.com'
+        ]
+        assert len(rows) == 3
+
+
+class TestMain:
+    """Test cases for the CLI entry point."""
+    
+    @patch('gpl.cli.PubMedSearcher')
+    def test_api_key_option(self, mock_searcher):
+        """Test that --api-key is passed to PubMedSearcher."""
+        mock_searcher.return_value.search_papers.return_value = []
+        
+        result = CliRunner().invoke(main, ['cancer', '--no-cache', '--api-key', 'SECRET'], env={'NCBI_API_KEY': None})
+        
+        assert result.exit_code == 0
+        mock_searcher.assert_called_once_with(cache=None, api_key='SECRET')
+    
+    @patch('gpl.cli.PubMedSearcher')
+    def test_api_key_from_environment(self, mock_searcher):
+        """Test that NCBI_API_KEY is used when --api-key is not given."""
+        mock_searcher.return_value.search_papers.return_value = []
+        
+        result = CliRunner().invoke(main, ['cancer', '--no-cache'], env={'NCBI_API_KEY': 'FROM_ENV'})
+        
+        assert result.exit_code == 0
+        mock_searcher.assert_called_once_with(cache=None, api_key='FROM_ENV')
+    
+    @patch('gpl.cli.PubMedSearcher')
+    def test_no_api_key(self, mock_searcher):
+        """Test that no key is passed when neither option nor variable is set."""
+        mock_searcher.return_value.search_papers.return_value = []
+        
+        result = CliRunner().invoke(main, ['cancer', '--no-cache'], env={'NCBI_API_KEY': None})
+        
+        assert result.exit_code == 0
+        mock_searcher.assert_called_once_with(cache=None, api_key=None)
+    
+    @patch('gpl.cli.PubMedSearcher')
+    def test_debug_keeps_urllib3_quiet(self, mock_searcher):
+        """Test that --debug does not enable urllib3 request-line logging."""
+        mock_searcher.return_value.search_papers.return_value = []
+        
+        result = CliRunner().invoke(main, ['cancer', '--no-cache', '--debug'], env={'NCBI_API_KEY': None})
+        
+        assert result.exit_code == 0
+        assert not logging.getLogger('urllib3').isEnabledFor(logging.DEBUG)
@@ -2,9 +2,80 @@
 Basic tests for the GPL core module.
 """
 
+import sqlite3
+import xml.etree.ElementTree as ET
+
 import pytest
+import requests
 from unittest.mock import Mock, patch, MagicMock
-from gpl.core import PubMedSearcher, PubMedAPIError, PubMedPaper
+from gpl.cache import ResponseCache
+from gpl.core import PubMedSearcher, PubMedAPIError, PubMedPaper, _EMAIL_RE, _is_company_affiliation
+
+
+SAMPLE_XML = b"""<?xml version="1.0" ?>
+<PubmedArticleSet>
+<PubmedArticle>
+    <MedlineCitation Status="MEDLINE" Owner="NLM">
+        <PMID Version="1">12345</PMID>
+        <Article PubModel="Print">
+            <Journal>
+                <JournalIssue CitedMedium="Internet">
+                    <PubDate>
+                        <Year>2023</Year>
+                        <Month>Jan</Month>
+                        <Day>15</Day>
+                    </PubDate>
+                </JournalIssue>
+            </Journal>
+            <ArticleTitle>Novel <i>KRAS</i> inhibitors &amp; oncology.</ArticleTitle>
+            <AuthorList CompleteYN="Y">
+                <Author ValidYN="Y">
+                    <LastName>Doe</LastName>
+                    <ForeName>John</ForeName>
+                    <AffiliationInfo>
+                        <Affiliation>Pfizer Inc., New York, NY, USA. john.doe@pfizer.com.</Affiliation>
+                    </AffiliationInfo>
+                </Author>
+                <Author ValidYN="Y">
+                    <LastName>Smith</LastName>
+                    <ForeName>Jane</ForeName>
+                    <AffiliationInfo>
+                        <Affiliation>Department of Biology, Harvard University, Cambridge, MA, USA.</Affiliation>
+                    </AffiliationInfo>
+                </Author>
+            </AuthorList>
+        </Article>
+    </MedlineCitation>
+</PubmedArticle>
+<PubmedArticle>
+    <MedlineCitation Status="MEDLINE" Owner="NLM">
+        <PMID Version="1">67890</PMID>
+        <Article PubModel="Print">
+            <Journal>
+                <JournalIssue CitedMedium="Internet">
+                    <PubDate>
+                        <Year>2022</Year>
+                    </PubDate>
+                </JournalIssue>
+            </Journal>
+            <AuthorList CompleteYN="Y">
+                <Author ValidYN="Y">
+                    <LastName>Lee</LastName>
+                    <ForeName>Ann</ForeName>
+                </Author>
+            </AuthorList>
+            <ELocationID EIdType="doi" ValidYN="Y">10.1000/xyz</ELocationID>
+        </Article>
+        <CommentsCorrectionsList>
+            <CommentsCorrections RefType="CommentOn">
+                <RefSource>Nature. 2020;1:1.</RefSource>
+                <PMID Version="1">11111</PMID>
+            </CommentsCorrections>
+        </CommentsCorrectionsList>
+    </MedlineCitation>
+</PubmedArticle>
+</PubmedArticleSet>
+"""
 
 
 class TestPubMedSearcher:
@@ -20,6 +91,60 @@ class TestPubMedSearcher:
         assert self.searcher.session is not None
         assert 'GPL-PubMed-Tool' in self.searcher.session.headers['User-Agent']
     
+    def test_init_with_api_key(self):
+        """Test that an API key raises the default request rate."""
+        searcher = PubMedSearcher(api_key='secret')
+        assert searcher.api_key == 'secret'
+        assert searcher.rate_limit == 0.1
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_make_request_rate_limit(self, mock_get, mock_sleep):
+        """Test that only back-to-back requests wait for the rate limit."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+        
+        self.searcher._make_request(self.searcher.SEARCH_URL, {})
+        mock_sleep.assert_not_called()
+        
+        self.searcher._make_request(self.searcher.SEARCH_URL, {})
+        mock_sleep.assert_called_once()
+        assert 0 < mock_sleep.call_args.args[0] <= self.searcher.rate_limit
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_make_request_sends_api_key(self, mock_get, mock_sleep):
+        """Test that the API key is added to request parameters."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+        
+        searcher = PubMedSearcher(api_key='secret')
+        searcher._make_request(searcher.SEARCH_URL, {'db': 'pubmed'})
+        
+        assert mock_get.call_args.kwargs['params'] == {'db': 'pubmed', 'api_key': 'secret'}
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_api_key_not_in_error_message(self, mock_get, mock_sleep):
+        """Test that HTTP errors do not expose the API key."""
+        mock_response = Mock()
+        mock_response.status_code = 400
+        mock_response.raise_for_status.side_effect = requests.HTTPError(
+            "400 Client Error: Bad Request for url: "
+            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&api_key=SECRET"
+        )
+        mock_get.return_value = mock_response
+        
+        searcher = PubMedSearcher(api_key='SECRET')
+        with pytest.raises(PubMedAPIError) as excinfo:
+            searcher.search_papers("cancer therapy")
+        
+        assert 'SECRET' not in str(excinfo.value)
+        assert '400 Client Error' in str(excinfo.value)
+        assert 'SECRET' not in repr(excinfo.value.__context__)
+    
     @patch('gpl.core.PubMedSearcher.fetch_paper_details')
     @patch('time.sleep')
     @patch('requests.Session.get')
@@ -54,6 +179,36 @@ class TestPubMedSearcher:
         assert result[0].title == 'Test Paper'
         mock_get.assert_called_once()
     
+    @patch('gpl.core.PubMedSearcher.fetch_paper_details')
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_search_papers_dedupes_affiliations(self, mock_get, mock_sleep, mock_fetch):
+        """Test that affiliations are deduplicated case-insensitively in author order."""
+        mock_response = Mock()
+        mock_response.json.return_value = {'esearchresult': {'idlist': ['12345']}}
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        mock_fetch.return_value = [
+            {
+                'pmid': '12345',
+                'title': 'Test Paper',
+                'authors': [
+                    {'name': 'John Doe', 'affiliation': 'Pfizer Inc.'},
+                    {'name': 'Jane Roe', 'affiliation': 'Moderna Inc.'},
+                    {'name': 'Ann Lee', 'affiliation': 'PFIZER INC. '},
+                    {'name': 'Bob Kim', 'affiliation': ''}
+                ],
+                'pub_date': {'year': '2023'},
+                'emails': []
+            }
+        ]
+        
+        result = self.searcher.search_papers("cancer therapy")
+        
+        assert result[0].company_affiliations == ['Pfizer Inc.', 'Moderna Inc.']
+        assert result[0].non_academic_authors == ['John Doe', 'Jane Roe', 'Ann Lee', 'Bob Kim']
+    
     @patch('gpl.core.PubMedSearcher.fetch_paper_details')
     @patch('time.sleep')
     @patch('requests.Session.get')
@@ -82,6 +237,257 @@ class TestPubMedSearcher:
         with pytest.raises(PubMedAPIError):
             self.searcher.search_papers("test query")
     
+    def test_parse_xml_response(self):
+        """Test parsing of efetch XML into paper dictionaries."""
+        papers = self.searcher._parse_xml_response(SAMPLE_XML)
+        
+        assert len(papers) == 2
+        assert papers[0]['pmid'] == '12345'
+        assert papers[0]['title'] == "Novel KRAS inhibitors & oncology."
+        assert papers[0]['authors'][0] == {
+            'name': 'John Doe',
+            'affiliation': 'Pfizer Inc., New York, NY, USA. john.doe@pfizer.com.'
+        }
+        assert papers[0]['authors'][1]['name'] == 'Jane Smith'
+        assert papers[0]['pub_date'] == {'year': '2023', 'month': 'Jan', 'day': '15'}
+        assert papers[0]['emails'] == ['john.doe@pfizer.com']
+        assert papers[1]['pmid'] == '67890'
+        assert papers[1]['title'] == ''
+        assert papers[1]['authors'] == [{'name': 'Ann Lee', 'affiliation': ''}]
+        assert papers[1]['pub_date'] == {'year': '2022', 'month': '', 'day': ''}
+        assert papers[1]['emails'] == []
+    
+    def test_parse_xml_response_releases_articles(self):
+        """Test that parsed articles are detached from the document root."""
+        roots = []
+        real_iterparse = ET.iterparse
+        
+        def tracking_iterparse(*args, **kwargs):
+            for event, elem in real_iterparse(*args, **kwargs):
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+        
+        with patch('gpl.core.ET.iterparse', side_effect=tracking_iterparse):
+            papers = self.searcher._parse_xml_response(SAMPLE_XML)
+        
+        assert len(papers) == 2
+        assert len(roots[0]) == 0
+    
+    def test_parse_xml_response_email_fallback(self):
+        """Test that emails outside author affiliations are still found."""
+        xml_content = SAMPLE_XML.replace(
+            b'<ELocationID EIdType="doi" ValidYN="Y">10.1000/xyz</ELocationID>',
+            b'<Abstract><AbstractText>Contact: ann.lee@example.org</AbstractText></Abstract>'
+        )
+        papers = self.searcher._parse_xml_response(xml_content)
+        
+        assert papers[0]['emails'] == ['john.doe@pfizer.com']
+        assert papers[1]['emails'] == ['ann.lee@example.org']
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_fetch_paper_details_batches(self, mock_get, mock_sleep):
+        """Test that large PMID lists are fetched in batches and merged in order."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = SAMPLE_XML
+        mock_get.return_value = mock_response
+        
+        pmids = [str(i) for i in range(PubMedSearcher.FETCH_BATCH_SIZE * 2 + 1)]
+        result = self.searcher.fetch_paper_details(pmids)
+        
+        assert mock_get.call_count == 3
+        requested = [call.kwargs['params']['id'].split(',') for call in mock_get.call_args_list]
+        assert sorted(sum(requested, [])) == sorted(pmids)
+        assert [paper['pmid'] for paper in result] == ['12345', '67890'] * 3
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_make_request_retries_on_429(self, mock_get, mock_sleep):
+        """Test that throttled requests are retried after Retry-After."""
+        throttled = Mock()
+        throttled.status_code = 429
+        throttled.headers = {'Retry-After': '2'}
+        ok = Mock()
+        ok.status_code = 200
+        ok.raise_for_status.return_value = None
+        mock_get.side_effect = [throttled, ok]
+        
+        result = self.searcher._make_request(self.searcher.FETCH_URL, {})
+        
+        assert result is ok
+        assert mock_get.call_count == 2
+        mock_sleep.assert_any_call(2.0)
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_search_papers_uses_cache(self, mock_get, mock_sleep):
+        """Test that cached responses skip the network and the rate-limit delay."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"esearchresult": {"idlist": []}}'
+        mock_response.json.return_value = {'esearchresult': {'idlist': []}}
+        mock_get.return_value = mock_response
+        
+        searcher = PubMedSearcher(cache=ResponseCache(':memory:'))
+        searcher.search_papers("cancer therapy")
+        mock_sleep.reset_mock()
+        
+        result = searcher.search_papers("cancer therapy")
+        
+        assert result == []
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_search_error_not_cached(self, mock_get, mock_sleep):
+        """Test that an esearch ERROR payload is reported and not cached."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"esearchresult": {"ERROR": "Search Backend failed"}}'
+        mock_response.json.return_value = {'esearchresult': {'ERROR': 'Search Backend failed'}}
+        mock_get.return_value = mock_response
+        
+        searcher = PubMedSearcher(cache=ResponseCache(':memory:'))
+        for _ in range(2):
+            with pytest.raises(PubMedAPIError, match='Search Backend failed'):
+                searcher.search_papers("cancer therapy")
+        
+        assert mock_get.call_count == 2
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_malformed_fetch_not_cached(self, mock_get, mock_sleep):
+        """Test that a truncated efetch body is not served from the cache."""
+        truncated = Mock()
+        truncated.status_code = 200
+        truncated.content = SAMPLE_XML[:300]
+        complete = Mock()
+        complete.status_code = 200
+        complete.content = SAMPLE_XML
+        mock_get.side_effect = [truncated, complete, AssertionError('should be cached')]
+        
+        searcher = PubMedSearcher(cache=ResponseCache(':memory:'))
+        with pytest.raises(PubMedAPIError):
+            searcher.fetch_paper_details(['12345', '67890'])
+        
+        assert len(searcher.fetch_paper_details(['12345', '67890'])) == 2
+        assert len(searcher.fetch_paper_details(['12345', '67890'])) == 2
+        assert mock_get.call_count == 2
+    
+    def test_build_company_filtered_query(self):
+        """Test that the company affiliation filter is appended to the query."""
+        result = self.searcher._build_company_filtered_query("cancer therapy")
+        
+        assert result.startswith('(cancer therapy) AND (')
+        assert '"pfizer"[ad] OR ' in result
+        assert result.endswith(' OR lab[ad])')
+    
+    def test_filter_company_papers(self):
+        """Test filtering papers down to company-affiliated authors."""
+        papers_data = [
+            {
+                'pmid': '12345',
+                'title': 'Company Paper',
+                'authors': [
+                    {'name': 'John Doe', 'affiliation': 'Bristol-Myers Squibb, Princeton, NJ, USA.'},
+                    {'name': 'Jane Roe', 'affiliation': 'Department of Oncology, Stanford University.'},
+                    {'name': 'Ann Lee', 'affiliation': 'Johnson & Johnson, Spring House, PA, USA.'}
+                ],
+                'pub_date': {'year': '2023', 'month': 'Jan', 'day': '15'},
+                'emails': ['john.doe@bms.com']
+            },
+            {
+                'pmid': '67890',
+                'title': 'Academic Paper',
+                'authors': [
+                    {'name': 'Bob Kim', 'affiliation': 'Princeton University, Princeton, NJ, USA.'},
+                    {'name': 'Eve Park', 'affiliation': ''}
+                ],
+                'pub_date': {'year': '2022'},
+                'emails': []
+            }
+        ]
+        
+        result = self.searcher.filter_company_papers(papers_data)
+        
+        assert len(result) == 1
+        assert result[0].pubmed_id == '12345'
+        assert result[0].publication_date == 'Jan 15 2023'
+        assert result[0].non_academic_authors == ['John Doe', 'Ann Lee']
+        assert result[0].company_affiliations == [
+            'Bristol-Myers Squibb, Princeton, NJ, USA.',
+            'Johnson & Johnson, Spring House, PA, USA.'
+        ]
+        assert result[0].corresponding_email == 'john.doe@bms.com'
+    
+    def test_parse_xml_response_multiple_emails(self):
+        """Test extraction of several emails from one affiliation."""
+        xml_content = SAMPLE_XML.replace(
+            b'john.doe@pfizer.com.',
+            b'Electronic address: john.doe@pfizer.com; j.roe@research.pfizer.co.uk.'
+        )
+        papers = self.searcher._parse_xml_response(xml_content)
+        
+        assert papers[0]['emails'] == ['john.doe@pfizer.com', 'j.roe@research.pfizer.co.uk']
+    
+    def test_filter_company_papers_classifies_each_affiliation_once(self):
+        """Test that repeated affiliations reuse the cached classification."""
+        _is_company_affiliation.cache_clear()
+        affiliation = 'Amgen Inc., Thousand Oaks, CA, USA.'
+        papers_data = [
+            {'pmid': str(i), 'authors': [{'name': f'Author {i}', 'affiliation': affiliation}]}
+            for i in range(5)
+        ]
+        
+        result = self.searcher.filter_company_papers(papers_data)
+        
+        assert len(result) == 5
+        assert _is_company_affiliation.cache_info().misses == 1
+        assert _is_company_affiliation.cache_info().hits == 4
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_make_request_caps_retry_after(self, mock_get, mock_sleep):
+        """Test that a very long Retry-After is capped."""
+        throttled = Mock()
+        throttled.status_code = 429
+        throttled.headers = {'Retry-After': '3600'}
+        ok = Mock()
+        ok.status_code = 200
+        mock_get.side_effect = [throttled, ok]
+        
+        self.searcher._make_request(self.searcher.FETCH_URL, {})
+        
+        mock_sleep.assert_any_call(60.0)
+        assert all(call.args[0] <= 60.0 for call in mock_sleep.call_args_list)
+    
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_fetch_survives_cache_errors(self, mock_get, mock_sleep):
+        """Test that cache failures fall back to the network instead of failing."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = SAMPLE_XML
+        mock_get.return_value = mock_response
+        
+        cache = Mock()
+        cache.get.side_effect = sqlite3.OperationalError('database is locked')
+        cache.set.side_effect = sqlite3.OperationalError('database is locked')
+        searcher = PubMedSearcher(cache=cache)
+        
+        result = searcher.fetch_paper_details(['12345', '67890'])
+        
+        assert len(result) == 2
+        cache.set.assert_called_once()
+    
+    def test_email_pattern_rejects_empty_domain_labels(self):
+        """Test that domains with empty labels are not matched."""
+        assert _EMAIL_RE.findall('Contact: john@pfizer..com or a@.example.com') == []
+        assert _EMAIL_RE.findall('Contact: john.doe@pfizer.com.') == ['john.doe@pfizer.com']
+    
     def test_format_publication_date_full(self):
         """Test full date formatting."""
         pub_date = {'year': '2023', 'month': 'January', 'day': '15'}
@@ -94,6 +500,11 @@ class TestPubMedSearcher:
         result = self.searcher._format_publication_date(pub_date)
         assert result == 'Jan 15 2023'
     
+    def test_format_publication_date_zero_padded_month(self):
+        """Test zero-padded and out-of-range numeric months."""
+        assert self.searcher._format_publication_date({'year': '2023', 'month': '09'}) == 'Sep 2023'
+        assert self.searcher._format_publication_date({'year': '2023', 'month': '13'}) == '13 2023'
+    
     def test_format_publication_date_year_only(self):
         """Test year-only formatting."""
         pub_date = {'year': '2023'}
@@ -138,3 +549,11 @@ class TestPubMedPaper:
         assert paper.non_academic_authors == ['John Doe']
         assert paper.company_affiliations == ['Pfizer Inc.']
         assert paper.corresponding_email == 'test@pfizer.com'
+    
+    def test_pubmed_paper_uses_slots(self):
+        """Test that PubMedPaper instances carry no per-instance __dict__."""
+        paper = PubMedPaper('12345', 'Test Paper', '2023', [], [], '')
+        
+        assert not hasattr(paper, '__dict__')
+        with pytest.raises(AttributeError):
+            paper.extra = 'value'